@@ -1,109 +1,339 @@
 #!/usr/bin/env python3
-"""Run Docker containers in parallel using threads and subprocess."""
+"""Run Docker containers in parallel using asyncio subprocesses."""
 
+import asyncio
+import atexit
+import signal
 import subprocess
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
-from typing import List, Tuple, Optional
+from typing import List, Set, Tuple, Optional
 import os
+import shutil
+import functools
 
-def run_docker_container(command: str) -> Tuple[int, Optional[str], Optional[str]]:
+# Resolved once so subprocess gets an absolute path, which together with
+# close_fds=False lets it launch docker through posix_spawn instead of
+# fork/exec
+DOCKER = shutil.which("docker") or "docker"
+
+IMAGE = "py-cl-7"
+
+# Arguments that never change between calls, built once at import
+_CWD = os.getcwd()
+_RUN_PREFIX = (
+    DOCKER, "run", "-d", "--rm",
+    "-u", "coder",
+    "-v", f"{_CWD}:/home/coder/project",
+    "-w", "/home/coder/project",
+    "--entrypoint", "sleep"
+)
+_EXEC_PREFIX = (DOCKER, "exec", "-i")
+
+# Shell loop that echoes each command read from stdin inside a container,
+# terminating every command's output with a NUL byte
+_BATCH_SCRIPT = r"""while IFS= read -r line; do printf '%s\n\000' "$line"; done"""
+_BATCH_ARGS = ("sh", "-c", _BATCH_SCRIPT)
+
+
+# IDs of pooled containers that are still running, so they can be removed
+# even when the process exits without closing its pool
+_live_containers: Set[str] = set()
+
+
+def _remove_live_containers() -> None:
+    """Force-remove containers left behind by an interrupted run."""
+    container_ids = list(_live_containers)
+    if container_ids:
+        subprocess.run(
+            [DOCKER, "rm", "-f", *container_ids],
+            capture_output=True,
+            close_fds=False
+        )
+        _live_containers.difference_update(container_ids)
+
+
+atexit.register(_remove_live_containers)
+
+
+async def _remove_containers(container_ids: List[str]) -> None:
+    """Force-remove the given containers."""
+    if container_ids:
+        proc = await asyncio.create_subprocess_exec(
+            DOCKER, "rm", "-f", *container_ids,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            close_fds=False
+        )
+        await proc.wait()
+        _live_containers.difference_update(container_ids)
+
+
+async def _run_argv(tail: Tuple[str, ...], input: bytes, prefix: Tuple[str, ...]) -> Tuple[int, bytes, bytes]:
     """
-    Run a single Docker container with echo command.
+    Run ``prefix + tail`` with ``input`` on stdin.
     
-    Args:
-        index: The string to prompt the container with
-        
     Returns:
-        Tuple of (index, stdout, stderr)
+        Tuple of (returncode, stdout, stderr)
     """
-    cmd = [
-        "docker", "run",
-        "-u", "coder",
-        "-v", f"{os.getcwd()}:/home/coder/project",
-        "-w", "/home/coder/project",
-        "--rm", 
-        "py-cl-7",
-        "sh", "-c", f"echo '{command}'"
-    ]
+    proc = await asyncio.create_subprocess_exec(
+        *prefix, *tail,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=False
+    )
+    stdout, stderr = await proc.communicate(input)
+    return (proc.returncode, stdout, stderr)
+
+
+class ContainerPool:
+    """
+    Pool of long-lived containers that commands are executed in.
+    
+    Containers are started once with ``docker run -d`` and reused through
+    ``docker exec``, so each command skips the cost of creating and tearing
+    down a fresh container. Use as an ``async with`` block, or call
+    ``start()`` and ``close()`` to keep the pool across several runs.
+    
+    The pool hands out runners: ``functools.partial`` objects with the
+    ``docker exec`` prefix for one container already bound, called as
+    ``await run(tail, input)``.
+    """
+    
+    def __init__(self, size: int, image: str = IMAGE):
+        """
+        Args:
+            size: Number of containers to keep running
+            image: Docker image the containers are started from
+        """
+        self.size = size
+        self.image = image
+        self.container_ids: List[str] = []
+        self._idle: Optional["asyncio.Queue[functools.partial]"] = None
+    
+    async def __aenter__(self) -> "ContainerPool":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def start(self) -> None:
+        """Start the pool's containers."""
+        # Created here so the queue is bound to the running event loop
+        self._idle = asyncio.Queue()
+        await self._add_containers(self.size)
+    
+    async def grow(self, size: int) -> None:
+        """Start more containers so that the pool holds ``size`` of them."""
+        if size > self.size:
+            await self._add_containers(size - self.size)
+            self.size = size
+    
+    async def _add_containers(self, count: int) -> None:
+        """Start ``count`` containers and make them available."""
+        # Start all containers concurrently, keeping track of the ones that
+        # came up so they can be removed if any of the others failed
+        started = await asyncio.gather(
+            *(self._start_container() for _ in range(count)),
+            return_exceptions=True
+        )
+        new_ids = [r for r in started if isinstance(r, str)]
+        errors = [r for r in started if isinstance(r, BaseException)]
+        if errors:
+            await _remove_containers(new_ids)
+            raise errors[0]
+        
+        self.container_ids.extend(new_ids)
+        for container_id in new_ids:
+            self._idle.put_nowait(
+                functools.partial(_run_argv, prefix=_EXEC_PREFIX + (container_id,))
+            )
+    
+    async def _start_container(self) -> str:
+        """Start one idle container and return its ID."""
+        cmd = _RUN_PREFIX + (self.image, "infinity")
+        
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            close_fds=False
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd, stdout.decode(), stderr.decode()
+            )
+        container_id = stdout.decode().strip()
+        _live_containers.add(container_id)
+        return container_id
+    
+    async def acquire(self) -> functools.partial:
+        """Take an idle container's runner out of the pool, waiting if none is free."""
+        return await self._idle.get()
     
+    def release(self, run: functools.partial) -> None:
+        """Return a container's runner to the pool."""
+        self._idle.put_nowait(run)
+    
+    async def close(self) -> None:
+        """Remove every container started by the pool."""
+        await _remove_containers(self.container_ids)
+        self.container_ids = []
+
+
+def prewarm_image(image: str = IMAGE) -> None:
+    """
+    Have the Docker daemon look up the image before any container starts.
+    
+    This pays the cold image lookup once up front rather than inside the
+    first container start of a run. Failures are ignored; starting the
+    pool reports them properly.
+    """
     try:
-        result = subprocess.run(
-            cmd,
+        subprocess.run(
+            [DOCKER, "image", "inspect", image],
             capture_output=True,
-            text=True,
-            check=True
+            close_fds=False
         )
-        return (index, result.stdout.strip(), None)
-    except subprocess.CalledProcessError as e:
-        return (index, None, f"Error: {e.stderr.strip()}")
-    except Exception as e:
-        return (index, None, f"Error: {str(e)}")
+    except OSError:
+        pass
+
+
+async def run_docker_container(pool: ContainerPool, batch: List[Tuple[int, str]]) -> List[Tuple[int, Optional[bytes], Optional[bytes]]]:
+    """
+    Run a batch of echo commands in a single pooled Docker container.
+    
+    The commands are fed to one shell loop over stdin instead of starting
+    a ``docker exec`` per command.
+    
+    Args:
+        pool: Pool to take the container from
+        batch: List of (index, command) tuples with the strings to prompt
+            the container with
+        
+    Returns:
+        List of (index, stdout, stderr) tuples, left as raw bytes
+    """
+    commands_input = "".join(f"{command}\n" for _, command in batch).encode()
+    
+    run = await pool.acquire()
+    try:
+        _, stdout, stderr = await run(_BATCH_ARGS, commands_input)
+    finally:
+        pool.release(run)
+    
+    # Everything before the last NUL is complete output; commands after it
+    # never finished, so they get the batch's stderr instead
+    outputs = stdout.split(b"\0")[:-1]
+    if len(outputs) > len(batch):
+        # The outputs can't be matched to commands, so none of them is used
+        error = b"Error: got %d outputs for %d commands\n" % (len(outputs), len(batch))
+        return [(index, None, error + stderr) for index, _ in batch]
+    return [
+        (index, outputs[pos], None) if pos < len(outputs) else (index, None, stderr)
+        for pos, (index, _) in enumerate(batch)
+    ]
 
 
-def run_containers_parallel(num_containers: int, commands: List[str]) -> List[Tuple[int, Optional[str], Optional[str]]]:
+def run_containers_parallel(num_containers: int, commands: List[str]) -> List[Tuple[int, Optional[bytes], Optional[bytes]]]:
     """
     Run multiple Docker containers in parallel.
     
     Args:
         num_containers: Number of containers to run
+        commands: Single-line commands, split into one batch per container
         
     Returns:
         List of results (index, stdout, stderr) for each container
-    """
-    results = []
-    
-    # Use ThreadPoolExecutor to run containers in parallel
-    with ThreadPoolExecutor(max_workers=num_containers) as executor:
-        # Submit all tasks
-        future_to_index = {
-            executor.submit(run_docker_container, i): i 
-            for i in commands
-        }
         
-        # Collect results as they complete
-        for future in as_completed(future_to_index):
-            result = future.result()
-            results.append(result)
+    Raises:
+        ValueError: If a command contains a newline
+    """
+    # Batches are sent one command per line, so a newline would split a
+    # command in two and shift every later result in its batch
+    for command in commands:
+        if "\n" in command:
+            raise ValueError(f"Command must be a single line: {command!r}")
+    
+    prewarm_image()
+    return asyncio.run(_run_containers(num_containers, commands))
+
+
+async def _run_containers(num_containers: int, commands: List[str]) -> List[Tuple[int, Optional[bytes], Optional[bytes]]]:
+    """Start the container pool and run one batch of commands per container."""
+    indexed = list(enumerate(commands))
+    
+    # Never start more containers than there are commands to run
+    async with ContainerPool(min(num_containers, len(commands))) as pool:
+        batches = [indexed[i::pool.size] for i in range(pool.size)]
+        batch_results = await asyncio.gather(
+            *(run_docker_container(pool, batch) for batch in batches if batch)
+        )
     
-    # Sort results by index for consistent output
-    results.sort(key=lambda x: x[0])
+    # Place each result at its command's index for consistent output
+    results = [None] * len(commands)
+    for batch in batch_results:
+        for result in batch:
+            results[result[0]] = result
     return results
 
 
-def aggregate_and_display_results(results: List[Tuple[int, Optional[str], Optional[str]]]) -> None:
+def decode_output(data: Optional[bytes]) -> Optional[str]:
+    """Strip and decode raw container output for display."""
+    if data is None:
+        return None
+    return data.strip().decode("utf-8", "replace")
+
+
+def aggregate_and_display_results(results: List[Tuple[int, Optional[bytes], Optional[bytes]]]) -> None:
     """
     Aggregate and display results from all containers.
     
     Args:
         results: List of (index, stdout, stderr) tuples
     """
-    print("\n" + "="*50)
-    print("DOCKER CONTAINER RESULTS")
-    print("="*50 + "\n")
+    # Build the whole report first so it is written to stdout at once
+    parts = [
+        "\n" + "="*50 + "\n",
+        "DOCKER CONTAINER RESULTS\n",
+        "="*50 + "\n\n"
+    ]
     
     successful_runs = 0
     failed_runs = 0
     
     for index, stdout, stderr in results:
+        stdout, stderr = decode_output(stdout), decode_output(stderr)
         if stdout:
-            print(f"Container {index}: SUCCESS")
-            print(f"  Output: {stdout}")
+            parts.append(f"Container {index}: SUCCESS\n")
+            parts.append(f"  Output: {stdout}\n")
             successful_runs += 1
         else:
-            print(f"Container {index}: FAILED")
-            print(f"  Error: {stderr}")
+            parts.append(f"Container {index}: FAILED\n")
+            parts.append(f"  Error: {stderr}\n")
             failed_runs += 1
-        print()
+        parts.append("\n")
     
-    print("="*50)
-    print(f"SUMMARY: {successful_runs} successful, {failed_runs} failed")
-    print("="*50)
+    parts.append("="*50 + "\n")
+    parts.append(f"SUMMARY: {successful_runs} successful, {failed_runs} failed\n")
+    parts.append("="*50 + "\n")
+    
+    sys.stdout.write("".join(parts))
+
+
+def _exit_on_sigterm(signum, frame):
+    """Turn SIGTERM into a normal exit so the atexit cleanup removes any containers."""
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    sys.exit(128 + signum)
 
 
 def main():
     """Main entry point for the application."""
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    
     # Default number of containers
     num_containers = 5
     
@@ -125,7 +355,14 @@ def main():
                 "test 3"]
     
     # Run containers in parallel
-    results = run_containers_parallel(num_containers, commands)
+    try:
+        results = run_containers_parallel(num_containers, commands)
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to start containers: {e.stderr.strip()}")
+        sys.exit(1)
+    except OSError as e:
+        print(f"Failed to run docker: {e}")
+        sys.exit(1)
     
     # Display aggregated results
     aggregate_and_display_results(results)
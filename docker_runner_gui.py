@@ -5,9 +5,22 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 from typing import List, Tuple, Optional
+import asyncio
+import functools
+import queue
 import subprocess
-import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from docker_runner import ContainerPool, decode_output, prewarm_image
+
+# Run directly in a pooled container; the prompt is written to its stdin
+CLAUDE_ARGS = ("npx", "@anthropic-ai/claude-code", "-p", "--dangerously-skip-permissions")
+
+# How often (ms) the Tk thread applies queued updates, and how many per tick
+UI_POLL_INTERVAL = 50
+UI_MAX_UPDATES = 100
+
+# Seconds to wait for the pooled containers to be removed on window close
+POOL_CLOSE_TIMEOUT = 10
 
 
 class DockerRunnerGUI:
@@ -16,12 +29,27 @@ class DockerRunnerGUI:
         self.root.title("Docker Runner GUI")
         self.root.geometry("900x700")
         
-        # List to store command entries
-        self.command_entries = []
+        # Commands to run, in the order shown in the commands list
+        self.commands: List[str] = []
+        
+        # Updates posted by worker threads, applied on the Tk thread
+        self._ui_queue = queue.SimpleQueue()
+        
+        # One event loop for the window's lifetime; it owns the container
+        # pool so the same containers are reused by every run
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        self._pool: Optional[ContainerPool] = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Create main frames
         self.create_widgets()
         
+        # Warm the image cache in the background so the first run is fast
+        threading.Thread(target=prewarm_image, daemon=True).start()
+        
+        self.root.after(UI_POLL_INTERVAL, self._pump_ui)
+        
     def create_widgets(self):
         """Create all GUI widgets."""
         # Main container
@@ -39,17 +67,32 @@ class DockerRunnerGUI:
         commands_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         commands_frame.columnconfigure(0, weight=1)
         
-        # Commands list container with scrollbar
-        self.commands_container = ttk.Frame(commands_frame)
-        self.commands_container.grid(row=0, column=0, sticky=(tk.W, tk.E))
-        self.commands_container.columnconfigure(0, weight=1)
+        # New command entry with larger font
+        self.command_var = tk.StringVar()
+        command_entry = ttk.Entry(commands_frame, textvariable=self.command_var, font=('TkDefaultFont', 12))
+        command_entry.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        command_entry.bind("<Return>", lambda event: self.add_command())
         
         # Add command button
         add_button = ttk.Button(commands_frame, text="Add Command", command=self.add_command)
-        add_button.grid(row=1, column=0, pady=(10, 0))
+        add_button.grid(row=0, column=1, columnspan=2)
+        
+        # A single list widget shows every command, whatever their number
+        self.commands_tree = ttk.Treeview(commands_frame, columns=("command",), show="headings", height=5)
+        self.commands_tree.heading("command", text="Command", anchor=tk.W)
+        self.commands_tree.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        # Add scrollbar for the commands list
+        scrollbar = ttk.Scrollbar(commands_frame, orient=tk.VERTICAL, command=self.commands_tree.yview)
+        scrollbar.grid(row=1, column=2, sticky=(tk.N, tk.S), pady=(10, 0))
+        self.commands_tree.config(yscrollcommand=scrollbar.set)
+        
+        # Delete button
+        delete_button = ttk.Button(commands_frame, text="Delete Selected", command=self.delete_command)
+        delete_button.grid(row=2, column=0, columnspan=3, pady=(10, 0))
         
         # Add initial command
-        self.add_command()
+        self.add_command("Write a file called example.txt with 'Hello World'")
         
         # Control section
         control_frame = ttk.Frame(main_frame)
@@ -77,45 +120,28 @@ class DockerRunnerGUI:
                                                      font=('TkDefaultFont', 11))
         self.results_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-    def add_command(self):
-        """Add a new command entry."""
-        command_frame = ttk.Frame(self.commands_container)
-        command_frame.grid(row=len(self.command_entries), column=0, sticky=(tk.W, tk.E), pady=5)
-        command_frame.columnconfigure(0, weight=1)
-        
-        # Command text widget with larger font
-        command_text = tk.Text(command_frame, height=3, width=60, wrap=tk.WORD, 
-                              font=('TkDefaultFont', 12))
-        command_text.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
-        
-        # Add scrollbar for text widget
-        scrollbar = ttk.Scrollbar(command_frame, orient=tk.VERTICAL, command=command_text.yview)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        command_text.config(yscrollcommand=scrollbar.set)
-        
-        # Set default value if this is the first command
-        if not self.command_entries:
-            command_text.insert(1.0, "Write a file called example.txt with 'Hello World'")
+    def add_command(self, command: Optional[str] = None):
+        """Add a command, taken from the entry box if none is given."""
+        if command is None:
+            command = self.command_var.get().strip()
+            if not command:
+                messagebox.showwarning("No Command", "Please enter a command to add.")
+                return
+            self.command_var.set("")
+            
+        self.commands.append(command)
+        self.commands_tree.insert("", tk.END, values=(command,))
         
-        # Delete button
-        delete_button = ttk.Button(
-            command_frame, 
-            text="Delete", 
-            command=lambda f=command_frame, t=command_text: self.delete_command(f, t)
-        )
-        delete_button.grid(row=0, column=2, padx=(5, 0))
-        
-        # Store reference
-        self.command_entries.append(command_text)
-        
-    def delete_command(self, frame, text_widget):
-        """Delete a command entry."""
-        if len(self.command_entries) > 1:  # Keep at least one command
-            frame.destroy()
-            self.command_entries.remove(text_widget)
-            # Re-grid remaining frames
-            for i, child in enumerate(self.commands_container.winfo_children()):
-                child.grid(row=i, column=0, sticky=(tk.W, tk.E), pady=5)
+    def delete_command(self):
+        """Delete the selected commands."""
+        selected = self.commands_tree.selection()
+        if not selected:
+            messagebox.showwarning("Warning", "Select a command to delete.")
+        elif len(self.commands) > len(selected):  # Keep at least one command
+            # Delete from the back so earlier indices stay valid
+            for index in sorted((self.commands_tree.index(item) for item in selected), reverse=True):
+                del self.commands[index]
+            self.commands_tree.delete(*selected)
         else:
             messagebox.showwarning("Warning", "You must have at least one command.")
             
@@ -137,13 +163,8 @@ class DockerRunnerGUI:
         if max_workers is None:
             return
             
-        # Get commands
-        commands = []
-        for text_widget in self.command_entries:
-            # Get text from Text widget (excluding the trailing newline)
-            text = text_widget.get(1.0, tk.END).strip()
-            if text:
-                commands.append(text)
+        # Copy commands so edits during the run don't affect the worker
+        commands = list(self.commands)
         
         if not commands:
             messagebox.showwarning("No Commands", "Please enter at least one command.")
@@ -170,80 +191,104 @@ class DockerRunnerGUI:
         try:
             results = self.run_containers_parallel(commands, max_workers)
             # Update GUI in main thread
-            self.root.after(0, self.display_results, results)
+            self._ui_queue.put(functools.partial(self.display_results, results))
+        except subprocess.CalledProcessError as e:
+            message = f"Failed to start containers: {e.stderr.strip()}"
+            self._ui_queue.put(functools.partial(self.display_error, message))
         except Exception as e:
-            self.root.after(0, self.display_error, str(e))
+            self._ui_queue.put(functools.partial(self.display_error, str(e)))
         finally:
-            self.root.after(0, lambda: self.run_button.config(state="normal"))
+            self._ui_queue.put(functools.partial(self.run_button.config, state="normal"))
             
-    def run_docker_container(self, command: str) -> Tuple[str, Optional[str], Optional[str]]:
-        """Run a single Docker container with the given command."""
-        cmd = [
-            "docker", "run",
-            "-u", "coder",
-            "-v", f"{os.getcwd()}:/home/coder/project",
-            "-w", "/home/coder/project",
-            "--rm", 
-            "py-cl-7",
-            "sh", "-c", f"echo '{command}' | npx @anthropic-ai/claude-code -p --dangerously-skip-permissions"
-        ]
-        
+    def _pump_ui(self):
+        """Apply updates queued by worker threads, then reschedule."""
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return (command, result.stdout.strip(), None)
-        except subprocess.CalledProcessError as e:
-            return (command, None, f"Error: {e.stderr.strip()}")
+            for _ in range(UI_MAX_UPDATES):
+                try:
+                    update = self._ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                update()
+        finally:
+            # Keep pumping even if an update raised
+            self.root.after(UI_POLL_INTERVAL, self._pump_ui)
+            
+    async def run_docker_container(self, pool: ContainerPool, command: str) -> Tuple[str, Optional[bytes], Optional[bytes]]:
+        """Run the given command in a pooled Docker container."""
+        run = await pool.acquire()
+        try:
+            returncode, stdout, stderr = await run(CLAUDE_ARGS, f"{command}\n".encode())
+            # Output stays as bytes until it is displayed
+            if returncode != 0:
+                return (command, None, stderr)
+            return (command, stdout, None)
         except Exception as e:
-            return (command, None, f"Error: {str(e)}")
+            return (command, None, str(e).encode())
+        finally:
+            pool.release(run)
             
-    def run_containers_parallel(self, commands: List[str], max_workers: int) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    def run_containers_parallel(self, commands: List[str], max_workers: int) -> List[Tuple[str, Optional[bytes], Optional[bytes]]]:
         """Run multiple Docker containers in parallel."""
-        results = []
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_command = {
-                executor.submit(self.run_docker_container, command): command 
-                for command in commands
-            }
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_containers(commands, max_workers), self._loop
+        )
+        return future.result()
+        
+    async def _run_containers(self, commands: List[str], max_workers: int) -> List[Tuple[str, Optional[bytes], Optional[bytes]]]:
+        """Run all commands concurrently on the window's container pool."""
+        # Never start more containers than there are commands to run; an
+        # existing pool is reused and only grown, unless max_workers dropped
+        # below its size
+        size = min(max_workers, len(commands))
+        if self._pool is not None and self._pool.size > max_workers:
+            await self._close_pool()
+        if self._pool is None:
+            pool = ContainerPool(size)
+            await pool.start()
+            self._pool = pool
+        else:
+            await self._pool.grow(size)
             
-            # Collect results as they complete
-            for future in as_completed(future_to_command):
-                result = future.result()
-                results.append(result)
-                
-        return results
-        
-    def display_results(self, results: List[Tuple[str, Optional[str], Optional[str]]]):
+        return await asyncio.gather(
+            *(self.run_docker_container(self._pool, command) for command in commands)
+        )
+        
+    async def _close_pool(self):
+        """Remove the pooled containers, if any."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.close()
+        
+    def display_results(self, results: List[Tuple[str, Optional[bytes], Optional[bytes]]]):
         """Display results in the GUI."""
-        self.results_text.insert(tk.END, "="*60 + "\n")
-        self.results_text.insert(tk.END, "DOCKER CONTAINER RESULTS\n")
-        self.results_text.insert(tk.END, "="*60 + "\n\n")
+        # Build the whole report first so it reaches Tk in a single insert
+        parts = [
+            "="*60 + "\n",
+            "DOCKER CONTAINER RESULTS\n",
+            "="*60 + "\n\n"
+        ]
         
         successful_runs = 0
         failed_runs = 0
         
         for i, (command, stdout, stderr) in enumerate(results, 1):
+            stdout, stderr = decode_output(stdout), decode_output(stderr)
+            parts.append(f"Container {i} - Command: {command}\n")
             if stdout:
-                self.results_text.insert(tk.END, f"Container {i} - Command: {command}\n")
-                self.results_text.insert(tk.END, f"  Status: SUCCESS\n")
-                self.results_text.insert(tk.END, f"  Output: {stdout}\n")
+                parts.append(f"  Status: SUCCESS\n")
+                parts.append(f"  Output: {stdout}\n")
                 successful_runs += 1
             else:
-                self.results_text.insert(tk.END, f"Container {i} - Command: {command}\n")
-                self.results_text.insert(tk.END, f"  Status: FAILED\n")
-                self.results_text.insert(tk.END, f"  Error: {stderr}\n")
+                parts.append(f"  Status: FAILED\n")
+                parts.append(f"  Error: {stderr}\n")
                 failed_runs += 1
-            self.results_text.insert(tk.END, "\n")
+            parts.append("\n")
             
-        self.results_text.insert(tk.END, "="*60 + "\n")
-        self.results_text.insert(tk.END, f"SUMMARY: {successful_runs} successful, {failed_runs} failed\n")
-        self.results_text.insert(tk.END, "="*60 + "\n")
+        parts.append("="*60 + "\n")
+        parts.append(f"SUMMARY: {successful_runs} successful, {failed_runs} failed\n")
+        parts.append("="*60 + "\n")
+        
+        self.results_text.insert(tk.END, "".join(parts))
         
         # Scroll to bottom
         self.results_text.see(tk.END)
@@ -252,6 +297,17 @@ class DockerRunnerGUI:
         """Display error message in results."""
         self.results_text.insert(tk.END, f"\nERROR: {error_message}\n")
         self.results_text.see(tk.END)
+        
+    def on_close(self):
+        """Remove the pooled containers and stop the event loop, then close the window."""
+        future = asyncio.run_coroutine_threadsafe(self._close_pool(), self._loop)
+        try:
+            future.result(timeout=POOL_CLOSE_TIMEOUT)
+        except Exception:
+            # Anything left behind is removed by docker_runner's exit hook
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.root.destroy()
 
 
 def main():
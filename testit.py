@@ -4,28 +4,33 @@ def fibonacci(n):
     """Generate Fibonacci sequence up to n terms"""
     if n <= 0:
         return []
-    elif n == 1:
-        return [0]
-    elif n == 2:
-        return [0, 1]
     
-    fib_sequence = [0, 1]
-    for i in range(2, n):
-        next_num = fib_sequence[-1] + fib_sequence[-2]
-        fib_sequence.append(next_num)
+    # Preallocate and carry the last two terms in locals instead of
+    # indexing back into the list and appending on every step
+    fib_sequence = [0] * n
+    a, b = 0, 1
+    for i in range(n):
+        fib_sequence[i] = a
+        a, b = b, a + b
     
     return fib_sequence
 
+def _fibonacci_pair(k):
+    """Return (F(k), F(k+1)) using fast doubling, with F(0) = 0"""
+    if k == 0:
+        return (0, 1)
+    a, b = _fibonacci_pair(k >> 1)
+    c = a * (2 * b - a)
+    d = a * a + b * b
+    if k & 1:
+        return (d, c + d)
+    return (c, d)
+
 def fibonacci_recursive(n):
     """Calculate nth Fibonacci number recursively"""
     if n <= 0:
         return None
-    elif n == 1:
-        return 0
-    elif n == 2:
-        return 1
-    else:
-        return fibonacci_recursive(n-1) + fibonacci_recursive(n-2)
+    return _fibonacci_pair(n - 1)[0]
 
 def main():
     # Demonstrate iterative approach